@@ -0,0 +1,54 @@
+# Numerical kernels for the MA200 strategy scripts.
+# Numba is optional - when it is not installed the kernels fall back to plain NumPy.
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    is_numba_installed = True
+except ImportError:
+    is_numba_installed = False
+    prange = range
+
+
+def _rolling_mean_2d(x, w):
+    """
+    Rolling mean over the rows of a [n_dates, n_tickers] matrix, computed column by column
+    with an incremental running sum (add the entering element, subtract the leaving one),
+    so the whole matrix costs O(n * m) instead of O(n * m * w).
+
+    Matches pandas rolling(w, min_periods=w).mean(): a cell is NaN unless all w observations
+    in its window are valid, which keeps tickers with missing bars out of the signal.
+
+    Accepts float32 as well as float64 input; the running sum is always accumulated in
+    float64 so a narrower input does not drift over the window.
+    """
+    n, m = x.shape
+    out = np.full_like(x, np.nan)
+    for j in prange(m):
+        s = 0.0  # float64 accumulator regardless of the input dtype
+        cnt = 0
+        for i in range(n):
+            v = x[i, j]
+            if v == v:  # not NaN
+                s += v
+                cnt += 1
+            if i >= w:
+                old = x[i - w, j]
+                if old == old:
+                    s -= old
+                    cnt -= 1
+            if cnt == w:
+                out[i, j] = s / w
+    return out
+
+
+if is_numba_installed:
+    # explicit signatures make the compilation eager, so together with cache=True the
+    # LLVM codegen happens once per machine instead of on the first event of every run
+    rolling_mean_2d = njit(["float32[:, :](float32[:, :], int64)",
+                            "float64[:, :](float64[:, :], int64)"],
+                           parallel=True, nogil=True, cache=True)(_rolling_mean_2d)
+else:
+    rolling_mean_2d = _rolling_mean_2d
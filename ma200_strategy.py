@@ -1,9 +1,10 @@
 # 200-Day Moving Average Strategy Implementation
 # Goes long when asset is above 200-day MA, otherwise holds cash
 
-import os
-import json
+import logging
+import numpy as np
 import pandas as pd
+from pandas.tseries.offsets import BDay
 
 from qf_lib.backtesting.events.time_event.regular_time_event.calculate_and_place_orders_event import \
     CalculateAndPlaceOrdersRegularEvent
@@ -15,107 +16,139 @@ from qf_lib.common.enums.frequency import Frequency
 from qf_lib.common.enums.price_field import PriceField
 from qf_lib.common.tickers.tickers import YFinanceTicker
 from qf_lib.common.utils.dateutils.string_to_date import str_to_date
+from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
 from qf_lib.data_providers.yfinance.yfinance_data_provider import YFinanceDataProvider
 from qf_lib.documents_utils.document_exporting.pdf_exporter import PDFExporter
 from qf_lib.documents_utils.excel.excel_exporter import ExcelExporter
 from qf_lib.settings import Settings
 from qf_lib.starting_dir import set_starting_dir_abs_path
 
+from ma200_kernels import rolling_mean_2d
+
 # Set the starting directory
 set_starting_dir_abs_path("/Users/macbook2024/Dropbox/AAA Backup/A Working/QF/qf-lib")
 
+MA_WINDOW = 200
+# Calendar buffer fetched before the backtest start date, so that the moving average
+# has a full 200 trading days of history available already on the first event
+LOOKBACK_BUFFER_DAYS = 320
+
 class MA200Strategy(AbstractStrategy):
     """
     Strategy that goes long when an asset is above its 200-day moving average and holds cash otherwise.
+    When a ticker -> group mapping (e.g. sectors) is given, the capital is split equally between the
+    groups with at least one active ticker and then equally within each group, instead of equally
+    across all active tickers.
     """
-    
-    def __init__(self, ts, tickers):
+
+    def __init__(self, ts, tickers, ticker_to_group=None):
         super().__init__(ts)
         self.broker = ts.broker
         self.order_factory = ts.order_factory
         self.data_provider = ts.data_provider
         self.tickers = tickers
-        print(f"Initialized strategy with {len(tickers)} tickers")
+        self.logger = qf_logger.getChild(self.__class__.__name__)
 
-    def calculate_and_place_orders(self):
-        print("calculate_and_place_orders called")
-        # Get current positions
-        positions = self.broker.get_positions()
-        current_positions = {p.ticker(): p.quantity() for p in positions}
-        print(f"Current positions: {current_positions}")
-        
-        # Calculate signals for each ticker
-        signals = {}
-        successful_tickers = 0
-        for ticker in self.tickers:
-            try:
-                # Get price history (need at least 200 days)
-                prices = self.data_provider.historical_price(ticker, PriceField.Close, 250)
-                
-                # Calculate 200-day moving average
-                if len(prices) >= 200:
-                    ma_200 = prices.tail(200).mean()
-                    current_price = prices.iloc[-1]
-                    
-                    # Generate signal: 1.0 if above MA, 0.0 if below
-                    signals[ticker] = 1.0 if current_price > ma_200 else 0.0
-                    print(f"{ticker}: Price={current_price:.2f}, MA200={ma_200:.2f}, Signal={signals[ticker]}")
-                    successful_tickers += 1
-                else:
-                    # Not enough data - hold cash
-                    signals[ticker] = 0.0
-                    print(f"{ticker}: Not enough data ({len(prices)} points), Signal=0.0")
-            except Exception as e:
-                # In case of any error, hold cash for this ticker
-                print(f"Error processing {ticker}: {e}")
-                signals[ticker] = 0.0
-        
-        print(f"Successfully processed {successful_tickers} out of {len(self.tickers)} tickers")
-        
-        # Normalize signals to equal weight
-        total_signal = sum(signals.values())
-        if total_signal > 0:
-            normalized_signals = {ticker: signal/total_signal for ticker, signal in signals.items() if signal > 0}
+        if ticker_to_group is not None:
+            # integer group ids aligned with the ticker columns, so that the group sums
+            # reduce to vectorized NumPy operations over the signal matrix
+            group_names = sorted({ticker_to_group[ticker] for ticker in tickers})
+            group_to_id = {group: i for i, group in enumerate(group_names)}
+            self.group_ids = np.array([group_to_id[ticker_to_group[ticker]] for ticker in tickers])
+            self.nr_of_groups = len(group_names)
         else:
-            normalized_signals = {ticker: 0.0 for ticker in self.tickers}
-        
-        print(f"Normalized signals: {normalized_signals}")
-        
+            self.group_ids = None
+
+        self._preload_prices_and_compute_ma(ts.start_date, ts.end_date)
+        self.logger.info("Initialized strategy with %d tickers", len(tickers))
+
+    def _preload_prices_and_compute_ma(self, start_date, end_date):
+        # Preload the whole dates x tickers Close matrix once, instead of re-downloading
+        # 250 bars per ticker on every scheduled event
+        preload_start = start_date - BDay(LOOKBACK_BUFFER_DAYS)
+        self.close_df = self.data_provider.get_price(self.tickers, PriceField.Close, preload_start, end_date,
+                                                     Frequency.DAILY, look_ahead_bias=True)
+
+        # Precompute the whole moving average matrix in one pass through the running-sum
+        # kernel (parallelized across tickers when numba is installed); this is O(N)
+        # instead of O(N * window) when recomputed per event
+        self.close_df = self.close_df.reindex(columns=self.tickers)
+
+        # Keep contiguous NumPy copies for the per-event hot path - indexing by integer row
+        # skips the pandas label-lookup machinery entirely. float32 is plenty for prices
+        # (7 significant digits) and halves the bytes streamed by the rolling kernel,
+        # which accumulates in float64 either way
+        self.dates_index = self.close_df.index
+        self.close_arr = np.ascontiguousarray(self.close_df.to_numpy(dtype=np.float32))
+        self.ma_arr = rolling_mean_2d(self.close_arr, MA_WINDOW)
+        self.ma200_df = pd.DataFrame(self.ma_arr, index=self.dates_index, columns=self.tickers)
+
+        # The whole boolean signal matrix is known up front (the signal only depends on
+        # preloaded data), so compare once here instead of once per event;
+        # NaN compares as False -> hold cash
+        self.signal_matrix = self.close_arr > self.ma_arr
+
+        # ... and since the weights are a deterministic function of the signals, the whole
+        # dates x tickers weights matrix is precomputed too - each event is then a pure row
+        # lookup with no arithmetic at all
+        if self.group_ids is not None:
+            group_one_hot = np.zeros((len(self.tickers), self.nr_of_groups))
+            group_one_hot[np.arange(len(self.tickers)), self.group_ids] = 1.0
+            group_sums = self.signal_matrix @ group_one_hot  # [n_dates, n_groups]
+            active_groups = np.count_nonzero(group_sums, axis=1)
+            self.weights_matrix = self.signal_matrix / np.maximum(group_sums[:, self.group_ids], 1.0) \
+                / np.maximum(active_groups, 1)[:, np.newaxis]
+        else:
+            row_sums = self.signal_matrix.sum(axis=1, keepdims=True)
+            self.weights_matrix = self.signal_matrix / np.maximum(row_sums, 1)
+
+    def _build_signals_for_date(self, date_idx):
+        """ Returns the precomputed {ticker: weight} map for the given integer row of the weights matrix. """
+        weights = self.weights_matrix[date_idx]
+        tickers_on = np.flatnonzero(weights)
+        if tickers_on.size == 0:
+            return {ticker: 0.0 for ticker in self.tickers}
+        return {self.tickers[j]: weights[j] for j in tickers_on}
+
+    def calculate_and_place_orders(self):
+        # %s-style formatting is deferred until a handler actually wants the record,
+        # so disabled debug logging costs a single level check per event
+        if self.logger.isEnabledFor(logging.DEBUG):
+            positions = self.broker.get_positions()
+            self.logger.debug("Current positions: %s", {p.ticker(): p.quantity() for p in positions})
+
+        # Calculate the already equally weighted signals from the preloaded matrices - the map
+        # contains the tickers which are currently above their moving average, or explicit
+        # zero weights for everything when none are
+        date_idx = self.dates_index.searchsorted(self.timer.now(), side='right') - 1
+        normalized_signals = self._build_signals_for_date(date_idx) if date_idx >= 0 \
+            else {ticker: 0.0 for ticker in self.tickers}
+
+        self.logger.debug("Normalized signals: %s", normalized_signals)
+
         # Create orders based on signals
         orders = self.order_factory.target_percent_orders(normalized_signals, MarketOrder(), TimeInForce.DAY)
         
         # Cancel any open orders and place the newly created ones
         self.broker.cancel_all_open_orders()
         if orders:
-            print(f"Placing {len(orders)} orders")
+            self.logger.debug("Placing %d orders", len(orders))
             self.broker.place_orders(orders)
-        else:
-            print("No orders to place")
 
 def main():
     # Read tickers from AssetList.xlsx
     df = pd.read_excel('/Users/macbook2024/Dropbox/AAA Backup/A Working/QF/qf-lib/AssetList.xlsx')
     tickers = [YFinanceTicker(ticker) for ticker in df['Ticker'].tolist()]
     print(f"Loaded {len(tickers)} tickers from AssetList.xlsx")
-    
-    # Create minimal settings configuration
-    config = {
-        "output_directory": "output"
-    }
-    
-    # Write config to temporary file
-    config_path = "/tmp/qf_settings.json"
-    with open(config_path, 'w') as f:
-        json.dump(config, f)
-    
+
     # Settings
     backtest_name = '200-Day MA Strategy'
     start_date = str_to_date("2020-01-03")
     end_date = str_to_date("2025-07-24")  # Current date
 
-    # Create settings object
-    settings = Settings(settings_path=config_path)
-    
+    # Create settings object directly in memory - no round-trip through a temporary file
+    settings = Settings.from_dict({"output_directory": "output"})
+
     # Create data provider
     data_provider = YFinanceDataProvider()
     
@@ -141,10 +174,7 @@ def main():
     print("Starting trading session...")
     ts.start_trading()
     print("Trading session completed.")
-    
-    # Clean up temporary config file
-    os.remove(config_path)
-    
+
     # Ensure proper exit
     import sys
     sys.exit(0)
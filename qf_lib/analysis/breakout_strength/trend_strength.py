@@ -12,9 +12,139 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+import numpy as np
+
 from qf_lib.common.enums.price_field import PriceField
 from qf_lib.containers.dataframe.prices_dataframe import PricesDataFrame
 
+try:
+    from numba import njit
+
+    is_numba_installed = True
+except ImportError:
+    is_numba_installed = False
+
+
+def _trend_strength_kernel(open_prices, high_prices, low_prices, close_prices):
+    # single fused pass instead of one array traversal per intermediate result; both
+    # means are NaN-aware with independent counts (v == v is False for NaN), exactly
+    # like the pandas Series means they replace - provider data with keepna=True
+    # routinely contains missing bars
+    sum_numerator = 0.0
+    cnt_numerator = 0
+    sum_denominator = 0.0
+    cnt_denominator = 0
+    for i in range(open_prices.shape[0]):
+        num = abs(close_prices[i] / open_prices[i] - 1.0)
+        if num == num:
+            sum_numerator += num
+            cnt_numerator += 1
+        den = high_prices[i] / low_prices[i] - 1.0
+        if den == den:
+            sum_denominator += den
+            cnt_denominator += 1
+    if cnt_numerator == 0 or cnt_denominator == 0:
+        return float('nan')
+    return (sum_numerator / cnt_numerator) / (sum_denominator / cnt_denominator)
+
+
+def _down_trend_strength_kernel(open_prices, high_prices, close_prices):
+    # the numerator is always valid on a down day (the comparison filters NaN rows out),
+    # but the denominator can still hit a missing High - count it separately
+    sum_numerator = 0.0
+    sum_denominator = 0.0
+    cnt_denominator = 0
+    nr_of_down_days = 0
+    for i in range(open_prices.shape[0]):
+        if close_prices[i] < open_prices[i]:
+            sum_numerator += open_prices[i] / close_prices[i] - 1.0
+            nr_of_down_days += 1
+            den = high_prices[i] / open_prices[i] - 1.0
+            if den == den:
+                sum_denominator += den
+                cnt_denominator += 1
+    if nr_of_down_days > 3 and cnt_denominator > 0:
+        return (sum_numerator / nr_of_down_days) / (sum_denominator / cnt_denominator)
+    return float('nan')
+
+
+def _up_trend_strength_kernel(open_prices, low_prices, close_prices):
+    sum_numerator = 0.0
+    sum_denominator = 0.0
+    cnt_denominator = 0
+    nr_of_up_days = 0
+    for i in range(open_prices.shape[0]):
+        if close_prices[i] > open_prices[i]:
+            sum_numerator += open_prices[i] / close_prices[i] - 1.0
+            nr_of_up_days += 1
+            den = low_prices[i] / open_prices[i] - 1.0
+            if den == den:
+                sum_denominator += den
+                cnt_denominator += 1
+    if nr_of_up_days > 3 and cnt_denominator > 0:
+        return (sum_numerator / nr_of_up_days) / (sum_denominator / cnt_denominator)
+    return float('nan')
+
+
+def _trend_strengths_all_kernel(open_prices, high_prices, low_prices, close_prices):
+    # all the sums and counts are accumulated in one traversal of the OHLC arrays, so
+    # computing the three statistics together costs a single pass over the data; the
+    # NaN handling mirrors the three separate kernels above
+    sum_numerator = 0.0
+    cnt_numerator = 0
+    sum_denominator = 0.0
+    cnt_denominator = 0
+    sum_num_down = 0.0
+    sum_den_down = 0.0
+    cnt_den_down = 0
+    sum_num_up = 0.0
+    sum_den_up = 0.0
+    cnt_den_up = 0
+    nr_of_down_days = 0
+    nr_of_up_days = 0
+    for i in range(open_prices.shape[0]):
+        num = abs(close_prices[i] / open_prices[i] - 1.0)
+        if num == num:
+            sum_numerator += num
+            cnt_numerator += 1
+        den = high_prices[i] / low_prices[i] - 1.0
+        if den == den:
+            sum_denominator += den
+            cnt_denominator += 1
+        if close_prices[i] < open_prices[i]:
+            sum_num_down += open_prices[i] / close_prices[i] - 1.0
+            nr_of_down_days += 1
+            den_down = high_prices[i] / open_prices[i] - 1.0
+            if den_down == den_down:
+                sum_den_down += den_down
+                cnt_den_down += 1
+        elif close_prices[i] > open_prices[i]:
+            sum_num_up += open_prices[i] / close_prices[i] - 1.0
+            nr_of_up_days += 1
+            den_up = low_prices[i] / open_prices[i] - 1.0
+            if den_up == den_up:
+                sum_den_up += den_up
+                cnt_den_up += 1
+    overall = (sum_numerator / cnt_numerator) / (sum_denominator / cnt_denominator) \
+        if cnt_numerator > 0 and cnt_denominator > 0 else float('nan')
+    down = (sum_num_down / nr_of_down_days) / (sum_den_down / cnt_den_down) \
+        if nr_of_down_days > 3 and cnt_den_down > 0 else float('nan')
+    up = (sum_num_up / nr_of_up_days) / (sum_den_up / cnt_den_up) \
+        if nr_of_up_days > 3 and cnt_den_up > 0 else float('nan')
+    return overall, down, up
+
+
+if is_numba_installed:
+    # explicit signatures compile the kernels eagerly at import; with cache=True the
+    # compiled code is persisted on disk, so repeated runs skip the JIT cost entirely
+    _scalar_kernel_signature = "float64(float64[:], float64[:], float64[:])"
+    _trend_strength_kernel = njit("float64(float64[:], float64[:], float64[:], float64[:])",
+                                  cache=True)(_trend_strength_kernel)
+    _down_trend_strength_kernel = njit(_scalar_kernel_signature, cache=True)(_down_trend_strength_kernel)
+    _up_trend_strength_kernel = njit(_scalar_kernel_signature, cache=True)(_up_trend_strength_kernel)
+    _trend_strengths_all_kernel = njit("UniTuple(float64, 3)(float64[:], float64[:], float64[:], float64[:])",
+                                       cache=True)(_trend_strengths_all_kernel)
+
 
 def trend_strength(prices_df: PricesDataFrame, use_next_open_instead_of_close=False):
     """
@@ -24,78 +154,130 @@ def trend_strength(prices_df: PricesDataFrame, use_next_open_instead_of_close=Fa
     if use_next_open_instead_of_close:
         prices_df = _replace_close_by_next_open(prices_df)
 
-    open_prices = prices_df[PriceField.Open]
-    close_prices = prices_df[PriceField.Close]
-    high_prices = prices_df[PriceField.High]
-    low_prices = prices_df[PriceField.Low]
+    open_prices = prices_df[PriceField.Open].to_numpy()
+    close_prices = prices_df[PriceField.Close].to_numpy()
+    high_prices = prices_df[PriceField.High].to_numpy()
+    low_prices = prices_df[PriceField.Low].to_numpy()
 
-    numerator = close_prices / open_prices - 1
-    numerator = numerator.abs()
+    if is_numba_installed:
+        return _trend_strength_kernel(open_prices, high_prices, low_prices, close_prices)
+
+    numerator = np.abs(close_prices / open_prices - 1)
     denominator = high_prices / low_prices - 1
 
-    result = numerator.mean() / denominator.mean()
-    return result
+    # NaN-aware means with independent counts, matching the pandas means of the
+    # original implementation (missing bars must not poison the whole statistic)
+    num_valid = ~np.isnan(numerator)
+    den_valid = ~np.isnan(denominator)
+    nr_of_valid_numerators = np.count_nonzero(num_valid)
+    nr_of_valid_denominators = np.count_nonzero(den_valid)
+    if nr_of_valid_numerators == 0 or nr_of_valid_denominators == 0:
+        return float('nan')
+
+    return (np.sum(numerator, where=num_valid) / nr_of_valid_numerators) \
+        / (np.sum(denominator, where=den_valid) / nr_of_valid_denominators)
 
 
 def down_trend_strength(prices_df: PricesDataFrame, use_next_open_instead_of_close=False):
     """
     Calculated only for down days. We study how much it moved down compared to how high it went before going down.
-    High figure suggests tha we can easily short when instruments starts to go down given day
+    High figure suggests that we can easily short when instrument starts to go down given day
     """
 
+    # with at most 3 rows there can never be more than 3 down days - return early,
+    # before paying for the column extraction and the arithmetic
+    if len(prices_df) <= 3:
+        return float('nan')
+
     if use_next_open_instead_of_close:
         prices_df = _replace_close_by_next_open(prices_df)
 
-    open_prices = prices_df[PriceField.Open]
-    close_prices = prices_df[PriceField.Close]
-    high_prices = prices_df[PriceField.High]
+    open_prices = prices_df[PriceField.Open].to_numpy()
+    close_prices = prices_df[PriceField.Close].to_numpy()
+    high_prices = prices_df[PriceField.High].to_numpy()
 
-    is_down_day = close_prices < open_prices
+    if is_numba_installed:
+        return _down_trend_strength_kernel(open_prices, high_prices, close_prices)
 
-    open_prices = open_prices.loc[is_down_day]
-    close_prices = close_prices.loc[is_down_day]
-    high_prices = high_prices.loc[is_down_day]
+    is_down_day = close_prices < open_prices
+    nr_of_down_days = np.count_nonzero(is_down_day)
+    if nr_of_down_days <= 3:
+        return float('nan')
 
+    # summing with where= instead of materializing filtered copies of the arrays; the
+    # numerator is always valid on a down day, but the denominator can still hit a
+    # missing High, so its mean gets its own NaN-aware count (as with pandas means)
     numerator = open_prices / close_prices - 1
     denominator = high_prices / open_prices - 1
+    den_valid = is_down_day & ~np.isnan(denominator)
+    nr_of_valid_denominators = np.count_nonzero(den_valid)
+    if nr_of_valid_denominators == 0:
+        return float('nan')
 
-    if len(numerator) > 3:
-        result = numerator.mean() / denominator.mean()
-        return result
-    return float('nan')
+    return (np.sum(numerator, where=is_down_day) / nr_of_down_days) \
+        / (np.sum(denominator, where=den_valid) / nr_of_valid_denominators)
 
 
 def up_trend_strength(prices_df: PricesDataFrame, use_next_open_instead_of_close=False):
     """
-    Calculated only for up days. We study how much it moved down compared to how low it went before going down.
-    High figure suggests tha we can go long when instruments starts to go up given day
+    Calculated only for up days. We study how much it moved up compared to how low it went before going up.
+    High figure suggests that we can go long when instrument starts to go up given day
     """
 
+    if len(prices_df) <= 3:
+        return float('nan')
+
     if use_next_open_instead_of_close:
         prices_df = _replace_close_by_next_open(prices_df)
 
-    open_prices = prices_df[PriceField.Open]
-    close_prices = prices_df[PriceField.Close]
-    low_prices = prices_df[PriceField.Low]
+    open_prices = prices_df[PriceField.Open].to_numpy()
+    close_prices = prices_df[PriceField.Close].to_numpy()
+    low_prices = prices_df[PriceField.Low].to_numpy()
+
+    if is_numba_installed:
+        return _up_trend_strength_kernel(open_prices, low_prices, close_prices)
 
     is_up_day = close_prices > open_prices
+    nr_of_up_days = np.count_nonzero(is_up_day)
+    if nr_of_up_days <= 3:
+        return float('nan')
 
-    open_prices = open_prices.loc[is_up_day]
-    close_prices = close_prices.loc[is_up_day]
-    low_prices = low_prices.loc[is_up_day]
+    numerator = open_prices / close_prices - 1  # will always be negative on up days
+    denominator = low_prices / open_prices - 1  # will always be negative on up days
+    den_valid = is_up_day & ~np.isnan(denominator)
+    nr_of_valid_denominators = np.count_nonzero(den_valid)
+    if nr_of_valid_denominators == 0:
+        return float('nan')
 
-    numerator = open_prices / close_prices - 1  # will always be negative
-    denominator = low_prices / open_prices - 1  # will always be negative
+    return (np.sum(numerator, where=is_up_day) / nr_of_up_days) \
+        / (np.sum(denominator, where=den_valid) / nr_of_valid_denominators)
 
-    if len(numerator) > 3:
-        result = numerator.mean() / denominator.mean()
-        return result
-    return float('nan')
+
+def trend_strengths_all(prices_df: PricesDataFrame, use_next_open_instead_of_close=False):
+    """
+    Computes the overall, down and up trend strengths together, traversing the OHLC data
+    only once. Use it instead of three separate calls when all the statistics are needed.
+
+    Returns
+    -------
+    Tuple[float, float, float]
+        (trend_strength, down_trend_strength, up_trend_strength)
+    """
+
+    if use_next_open_instead_of_close:
+        prices_df = _replace_close_by_next_open(prices_df)
+
+    if is_numba_installed:
+        open_prices = prices_df[PriceField.Open].to_numpy()
+        close_prices = prices_df[PriceField.Close].to_numpy()
+        high_prices = prices_df[PriceField.High].to_numpy()
+        low_prices = prices_df[PriceField.Low].to_numpy()
+        return _trend_strengths_all_kernel(open_prices, high_prices, low_prices, close_prices)
+
+    return (trend_strength(prices_df), down_trend_strength(prices_df), up_trend_strength(prices_df))
 
 
 def _replace_close_by_next_open(prices_df: PricesDataFrame):
-    result = prices_df.drop(columns=[PriceField.Close])
-    open_prices = prices_df[PriceField.Open]
-    result[PriceField.Close] = open_prices.shift(-1)  # shift to put open of next day instead of close
-    result = result.drop(result.index[-1])  # remove the last row that will have a NaN
-    return result
+    result = prices_df.copy()
+    result[PriceField.Close] = prices_df[PriceField.Open].shift(-1)  # put open of next day instead of close
+    return result.iloc[:-1]  # remove the last row that will have a NaN
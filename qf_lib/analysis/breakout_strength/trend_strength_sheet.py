@@ -18,7 +18,8 @@ from typing import Sequence
 
 import matplotlib as plt
 
-from qf_lib.analysis.breakout_strength.trend_strength import trend_strength, down_trend_strength, up_trend_strength
+from qf_lib.analysis.breakout_strength.trend_strength import down_trend_strength, trend_strength, \
+    trend_strengths_all, up_trend_strength
 from qf_lib.common.enums.matplotlib_location import Location
 from qf_lib.common.enums.price_field import PriceField
 from qf_lib.common.tickers.tickers import Ticker
@@ -155,15 +156,16 @@ class TrendStrengthSheet:
         table.add_row(["Start date", date_to_str(series.index[0])])
         table.add_row(["End date", date_to_str(series.index[-1])])
 
-        trend_strength_overall = trend_strength(prices_df, self.use_next_open_instead_of_close)
+        trend_strength_overall, down_strength, up_strength = \
+            trend_strengths_all(prices_df, self.use_next_open_instead_of_close)
         table.add_row(["Overall strength of the day trends", trend_strength_overall])
 
         trend_strength_1y = trend_strength(prices_df.tail(252), self.use_next_open_instead_of_close)
         table.add_row(["Strength of the day trends in last 1Y", trend_strength_1y])
         self.ticker_to_trend_dict[ticker] = (trend_strength_1y, trend_strength_overall)
 
-        table.add_row(["Up trends strength", up_trend_strength(prices_df, self.use_next_open_instead_of_close)])
-        table.add_row(["Down trends strength", down_trend_strength(prices_df, self.use_next_open_instead_of_close)])
+        table.add_row(["Up trends strength", up_strength])
+        table.add_row(["Down trends strength", down_strength])
         self.document.add_element(table)
 
     def _add_price_chart(self, prices_df: QFDataFrame):
@@ -120,7 +120,8 @@ class YFinanceDataProvider(AbstractPriceDataProvider):
         df = yf.download(list(set(tickers_str)), start_date, end_date, keepna=True,
                          interval=self._frequency_to_period(frequency),
                          auto_adjust=auto_adjust,
-                         progress=False)
+                         progress=False,
+                         threads=True)  # fetch the per-ticker requests concurrently - the download is I/O bound
         df = df.reindex(columns=MultiIndex.from_product([fields, tickers_str]))
         values = df.values.reshape(len(df), len(tickers), len(fields))
         qf_data_array = QFDataArray.create(df.index.rename("dates"), tickers, fields, values)
@@ -12,36 +12,191 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+import hashlib
 import os
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from os.path import join, abspath, dirname
 from typing import List
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-import base64
+from matplotlib.backends.backend_pdf import FigureCanvasPdf, PdfPages
+from matplotlib.figure import Figure
+try:
+    # SIMD-accelerated drop-in replacement for the stdlib base64, several times faster
+    # on the multi-MB payloads of embedded chart images
+    import pybase64 as base64
+except ImportError:
+    import base64
 import re
+import textwrap
+from html.parser import HTMLParser
 from io import BytesIO
 from PIL import Image
 import numpy as np
 
+try:
+    from lxml import etree
+
+    is_lxml_installed = True
+except ImportError:
+    is_lxml_installed = False
+
+try:
+    import fitz  # PyMuPDF
+
+    is_pymupdf_installed = True
+except ImportError:
+    is_pymupdf_installed = False
+
 from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
 from qf_lib.documents_utils.document_exporting.document import Document
 from qf_lib.documents_utils.document_exporting.document_exporter import DocumentExporter
 from qf_lib.settings import Settings
 from qf_lib.starting_dir import get_starting_dir_abs_path
 
+# Compiled once at import; collapses the runs of blank lines left over by block tags
+_WS_RE = re.compile(r'\n\s*\n')
+
+# Decoded images never need more pixels than a US Letter page at 200 dpi
+_MAX_IMAGE_SIZE_PX = (1700, 2200)
+
+# US Letter geometry in PDF points, with a half-inch margin, for the PyMuPDF backend
+_PAGE_WIDTH_PT = 612
+_PAGE_HEIGHT_PT = 792
+_PAGE_MARGIN_PT = 36
+
+# MuPDF's default line height at 10 pt is ~13.8 pt, so the 720 pt text box fits 52 lines;
+# insert_textbox writes nothing at all when the text overflows, so stay safely below
+_LINES_PER_PAGE = 50
+
+# Both backends render text in a monospace font at 10 pt (6 pt per character), so 88
+# characters stay inside the 540 pt wide text box - lines are pre-wrapped to this budget
+# before being counted into pages, since extractor output (e.g. flattened table rows)
+# can be arbitrarily long
+_WRAP_WIDTH_CHARS = 88
+
+# The embedded charts are always PNG or JPEG; checking the magic bytes is enough to
+# reject anything else without a decode attempt
+_JPEG_MAGIC = b'\xff\xd8\xff'
+_PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+
+# Upper bound on the number of merged documents kept alive by the memoization in
+# generate() - each entry holds its elements and rendered HTML in memory
+_MERGED_DOCUMENT_CACHE_SIZE = 32
+
+
+def _wrap_lines(text_content: str) -> List[str]:
+    """
+    Splits the text into lines no longer than the page character budget, so that the
+    per-page line counting of both backends is exact.
+    """
+    lines = []
+    for line in text_content.split('\n'):
+        if len(line) <= _WRAP_WIDTH_CHARS:
+            lines.append(line)
+        else:
+            lines.extend(textwrap.wrap(line, _WRAP_WIDTH_CHARS))
+    return lines
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Streaming HTML -> (text, image srcs) converter. The parser walks the document once,
+    appending text chunks to a list which is joined at the end and collecting the src of
+    every img tag on the way - guaranteed linear time, unlike parsing HTML with regular
+    expressions, and a single pass instead of one regex scan per tag rule plus another
+    for the images.
+    """
+
+    _SKIPPED_TAGS = {'script', 'style'}
+    _HEADER_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.images = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == 'img':
+            src = dict(attrs).get('src')
+            if src:
+                self.images.append(src)
+        elif tag == 'br':
+            self.parts.append('\n')
+        elif tag == 'li':
+            self.parts.append('\n• ')
+        elif tag == 'td':
+            self.parts.append(' | ')
+        elif tag in self._HEADER_TAGS:
+            self.parts.append('\n\n')
+        elif tag in ('p', 'tr'):
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag == 'td':
+            self.parts.append(' | ')
+        elif tag in ('p', 'tr', 'li') or tag in self._HEADER_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+    def get_text(self) -> str:
+        return _WS_RE.sub('\n\n', "".join(self.parts)).strip()
+
+
+class _LxmlTextTarget:
+    """
+    lxml target-parser adapter around _TextExtractor: the tokenizing runs in lxml's
+    C parser while the per-tag emit rules stay shared with the stdlib fallback.
+    """
+
+    def __init__(self):
+        self._extractor = _TextExtractor()
+
+    def start(self, tag, attrib):
+        self._extractor.handle_starttag(tag, list(attrib.items()))
+
+    def end(self, tag):
+        self._extractor.handle_endtag(tag)
+
+    def data(self, text):
+        self._extractor.handle_data(text)
+
+    def comment(self, text):
+        pass
+
+    def close(self) -> str:
+        return self._extractor.get_text()
+
+    @property
+    def images(self):
+        return self._extractor.images
+
 
 class SimplePDFExporter(DocumentExporter):
     """
-    A simpler PDF exporter that uses matplotlib to generate PDF files.
-    This replaces the WeasyPrint-based PDFExporter with a lighter alternative.
+    A simpler PDF exporter that uses PyMuPDF (when installed) or matplotlib to generate
+    PDF files. This replaces the WeasyPrint-based PDFExporter with a lighter alternative.
+
+    The PyMuPDF backend writes text and embedded images straight into the PDF without
+    rasterizing through matplotlib's Agg canvas, which is both considerably faster and
+    produces much smaller files; pass use_pymupdf=False to force the matplotlib backend.
     """
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, use_pymupdf: bool = True):
         super().__init__(settings)
         self.logger = qf_logger.getChild(self.__class__.__name__)
+        self._use_pymupdf = use_pymupdf and is_pymupdf_installed
+        self._merged_document_cache = OrderedDict()
 
     def generate(self, documents: List[Document], export_dir: str, filename: str,
-                 include_table_of_contents=False, css_file_names: List[str] = None) -> str:
+                 include_table_of_contents=False, css_file_names: List[str] = None, force=False) -> str:
         """
         Generates a PDF document from the provided documents.
 
@@ -57,107 +212,217 @@ class SimplePDFExporter(DocumentExporter):
             if True then table of contents will be generated at the beginning of the file
         css_file_names
             names of css files which should be applied for generating the PDF (not used in this implementation)
+        force
+            if True the merged document and its HTML are rebuilt even when a cached result
+            for the same document set exists
 
         Returns
         -------
         the absolute path to the output PDF file that was saved
         """
-        documents = [self._merge_documents(documents, filename)]
+        merged_document = self._merged_document_for(documents, filename, include_table_of_contents, force)
 
         # Find the output directory
         output_dir = self.get_output_dir(export_dir)
         output_filename = os.path.join(output_dir, filename.replace('.html', '.pdf'))
 
+        if self._use_pymupdf:
+            self._generate_with_pymupdf(merged_document, output_filename)
+        else:
+            self._generate_with_matplotlib(merged_document, output_filename)
+
+        self.logger.info("Rendering PDF in {}...".format(output_filename))
+        return output_filename
+
+    def _merged_document_for(self, documents: List[Document], filename: str,
+                             include_table_of_contents: bool, force: bool) -> Document:
+        # Merging and HTML rendering are pure functions of the document set, so repeated
+        # exports of the same documents (e.g. parameter sweeps) reuse the merged document
+        # - and with it the HTML cached by Document.generate_html - instead of rebuilding
+        # both from scratch. Keyed on object identity via repr; each entry also pins the
+        # source documents, since identity keys are only sound while the objects behind
+        # the addresses stay alive (a new document allocated at a reused address must not
+        # hit a stale entry). A re-export after mutating the documents in place still
+        # requires force=True.
+        key = hashlib.blake2b(repr((documents, filename, include_table_of_contents)).encode(),
+                              digest_size=16).hexdigest()
+        if not force and key in self._merged_document_cache:
+            self._merged_document_cache.move_to_end(key)
+            merged_document, _ = self._merged_document_cache[key]
+            return merged_document
+
+        merged_document = self._merge_documents(documents, filename)
+        if include_table_of_contents:
+            self._add_table_of_contents(merged_document)
+
+        self._merged_document_cache[key] = (merged_document, list(documents))
+        self._merged_document_cache.move_to_end(key)
+        while len(self._merged_document_cache) > _MERGED_DOCUMENT_CACHE_SIZE:
+            self._merged_document_cache.popitem(last=False)
+        return merged_document
+
+    def _generate_with_matplotlib(self, document: Document, output_filename: str):
         # Create PDF with matplotlib
         with PdfPages(output_filename) as pdf:
-            for document in documents:
-                if include_table_of_contents:
-                    self._add_table_of_contents(document)
+            # Generate the full document HTML
+            self.logger.info("Generating HTML for PDF...")
+            html = document.generate_html()
 
-                # Generate the full document HTML
-                self.logger.info("Generating HTML for PDF...")
-                html = document.generate_html()
-                
-                # Process the HTML and create PDF pages
-                self._process_html_content(html, pdf)
+            # Process the HTML and create PDF pages
+            self._process_html_content(html, pdf)
 
-        self.logger.info("Rendering PDF in {}...".format(output_filename))
-        return output_filename
+    def _generate_with_pymupdf(self, document: Document, output_filename: str):
+        # MuPDF writes text and the already-encoded PNG/JPEG image bytes straight into the
+        # PDF streams, so no page ever goes through an Agg rasterization round-trip
+        pdf_document = fitz.open()
+        try:
+            self.logger.info("Generating HTML for PDF...")
+            html = document.generate_html()
+            text_content, images = self._split_text_and_images(html)
 
-    def _process_html_content(self, html: str, pdf: PdfPages):
+            text_rect = fitz.Rect(_PAGE_MARGIN_PT, _PAGE_MARGIN_PT,
+                                  _PAGE_WIDTH_PT - _PAGE_MARGIN_PT, _PAGE_HEIGHT_PT - _PAGE_MARGIN_PT)
+            # pre-wrapped to the character budget and rendered in Courier, whose fixed
+            # 6 pt advance makes the budget exact - insert_textbox would otherwise
+            # re-wrap long lines itself, blow the per-page line count and (since it
+            # writes nothing on overflow) silently emit blank pages
+            lines = _wrap_lines(text_content)
+            for start in range(0, max(len(lines), 1), _LINES_PER_PAGE):
+                page = pdf_document.new_page(width=_PAGE_WIDTH_PT, height=_PAGE_HEIGHT_PT)
+                overflow = page.insert_textbox(text_rect, '\n'.join(lines[start:start + _LINES_PER_PAGE]),
+                                               fontsize=10, fontname="cour")
+                if overflow < 0:
+                    self.logger.warning("Text overflowed the page by %.1f pt and was dropped", -overflow)
+
+            for i, img_data in enumerate(images):
+                try:
+                    _, _, payload = img_data.partition(',')
+                    img_bytes = base64.b64decode(payload)
+                    if not (img_bytes[:3] == _JPEG_MAGIC or img_bytes[:8] == _PNG_MAGIC):
+                        self.logger.warning("Image %d is neither PNG nor JPEG - skipping", i + 1)
+                        continue
+                    page = pdf_document.new_page(width=_PAGE_WIDTH_PT, height=_PAGE_HEIGHT_PT)
+                    # insert_image keeps the aspect ratio within the rect and consumes the
+                    # original compressed bytes without decoding them to pixels
+                    page.insert_image(text_rect, stream=img_bytes)
+                except Exception as e:
+                    self.logger.warning(f"Could not process image {i+1}: {str(e)}")
+
+            # deflate recompresses the streams and garbage=4 deduplicates unused objects,
+            # keeping the output comparable in size to the source images
+            pdf_document.save(output_filename, deflate=True, garbage=4)
+        finally:
+            pdf_document.close()
+
+    def _split_text_and_images(self, html: str):
         """
-        Process HTML content and add it to the PDF.
+        Splits the HTML into its plain-text representation and the list of embedded
+        data-URI images in a single parser pass, shared by both PDF backends.
         """
-        # Extract images from HTML
-        images = self._extract_images(html)
-        
-        # Remove images from HTML for text processing
-        html_text = re.sub(r'<img[^>]*>', '', html)
-        
-        # Convert HTML to text
-        text_content = self._convert_html_to_text(html_text)
-        
-        # Create figure with text content
-        fig = plt.figure(figsize=(8.5, 11))  # US Letter size
-        fig.text(0.05, 0.95, text_content, fontsize=10, verticalalignment='top', wrap=True)
-        fig.text(0.05, 0.05, f"Page 1", fontsize=8, verticalalignment='bottom')
-        
-        # Save the figure to the PDF
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close(fig)
-        
-        # Add images as separate pages
-        for i, img_data in enumerate(images):
-            img_fig = plt.figure(figsize=(8.5, 11))
+        if is_lxml_installed and html:
             try:
-                # Decode base64 image
-                img_data = img_data.split(',')[1]  # Remove data:image/...;base64, prefix
-                img_bytes = base64.b64decode(img_data)
-                img = Image.open(BytesIO(img_bytes))
-                
-                # Display image
-                plt.imshow(img)
-                plt.axis('off')
-                plt.title(f"Image {i+1}")
-                
-                # Save image page to PDF
-                pdf.savefig(img_fig, bbox_inches='tight')
-                plt.close(img_fig)
-            except Exception as e:
-                self.logger.warning(f"Could not process image {i+1}: {str(e)}")
-                plt.close(img_fig)
-
-    def _extract_images(self, html: str) -> List[str]:
+                target = _LxmlTextTarget()
+                text_content = etree.fromstring(html, etree.HTMLParser(target=target))
+                return text_content, [src for src in target.images if src.startswith('data:image')]
+            except etree.LxmlError:
+                pass  # malformed beyond lxml's recovery - fall back to the stdlib parser
+
+        parser = _TextExtractor()
+        parser.feed(html)
+        return parser.get_text(), [src for src in parser.images if src.startswith('data:image')]
+
+    def _process_html_content(self, html: str, pdf: PdfPages):
         """
-        Extract base64 encoded images from HTML.
+        Process HTML content and add it to the PDF.
         """
-        images = re.findall(r'<img[^>]*src=(["\'])([^"\']*)\1[^>]*>', html)
-        return [img[1] for img in images if img[1].startswith('data:image')]
+        text_content, images = self._split_text_and_images(html)
+
+        # Create the text pages, chunked by line count rather than relying on wrap=True,
+        # which would make matplotlib measure every glyph to compute the wrapping (and
+        # cram all the text onto a single clipped page); the lines are pre-wrapped to
+        # the fixed character budget instead, which the monospace font makes exact
+        # without any width measuring. One figure is reused for all pages, its text
+        # artists cleared between savefig calls. Instantiating Figure directly skips
+        # pyplot's global figure manager and interactive canvas setup, none of which
+        # matter for file output (and there is no pyplot registry entry to close
+        # afterwards)
+        fig = Figure(figsize=(8.5, 11))  # US Letter size
+        FigureCanvasPdf(fig)
+        lines = _wrap_lines(text_content)
+        for page_idx, start in enumerate(range(0, max(len(lines), 1), _LINES_PER_PAGE)):
+            fig.text(0.05, 0.95, '\n'.join(lines[start:start + _LINES_PER_PAGE]),
+                     fontsize=10, family='monospace', verticalalignment='top')
+            fig.text(0.05, 0.05, f"Page {page_idx + 1}", fontsize=8, verticalalignment='bottom')
 
-    def _convert_html_to_text(self, html: str) -> str:
+            # Save the figure to the PDF
+            pdf.savefig(fig, bbox_inches='tight')
+            fig.texts.clear()
+
+        if not images:
+            return
+
+        # Add images as separate pages, reusing one figure and axes for all of them -
+        # a fresh figure per image would rebuild the canvas and artist tree every time.
+        # The decoding (base64 + libpng/libjpeg, both of which release the GIL) runs on a
+        # thread pool; the rendering stays serial since PdfPages appends to one stream
+        img_fig = Figure(figsize=(8.5, 11))
+        FigureCanvasPdf(img_fig)
+        img_ax = img_fig.add_subplot(111)
+        max_workers = min(len(images), os.cpu_count())
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # submit the decodes through a bounded window rather than all at once, so the
+            # decode of the upcoming images overlaps the render of the current one without
+            # ever holding more than a handful of decoded bitmaps in memory
+            prefetch_depth = min(max_workers + 1, len(images))
+            pending = deque(executor.submit(self._decode_image, images[j]) for j in range(prefetch_depth))
+            next_to_submit = prefetch_depth
+            for i in range(len(images)):
+                future = pending.popleft()
+                if next_to_submit < len(images):
+                    pending.append(executor.submit(self._decode_image, images[next_to_submit]))
+                    next_to_submit += 1
+                try:
+                    img = future.result()
+
+                    # Display image
+                    img_ax.clear()
+                    img_ax.imshow(img)
+                    img_ax.axis('off')
+                    img_ax.set_title(f"Image {i+1}")
+
+                    # Save image page to PDF
+                    pdf.savefig(img_fig, bbox_inches='tight')
+                except Exception as e:
+                    self.logger.warning(f"Could not process image {i+1}: {str(e)}")
+
+    @staticmethod
+    def _decode_image(img_data: str) -> np.ndarray:
         """
-        Convert HTML to a simplified text representation for the PDF.
-        This is a basic conversion that strips HTML tags and formats the content.
+        Decodes a base64 data-URI into a height x width x channels uint8 array.
         """
-        # Remove script and style elements
-        html = re.sub(r'<(script|style)[^>]*>.*?</\1>', '', html, flags=re.DOTALL)
-        
-        # Replace common HTML tags with formatting
-        html = re.sub(r'<br\s*/?>', '\n', html)
-        html = re.sub(r'<p[^>]*>', '\n', html)
-        html = re.sub(r'</p>', '\n', html)
-        html = re.sub(r'<h[1-6][^>]*>', '\n\n', html)
-        html = re.sub(r'</h[1-6]>', '\n', html)
-        html = re.sub(r'<li[^>]*>', '\n• ', html)
-        html = re.sub(r'</li>', '\n', html)
-        html = re.sub(r'<td[^>]*>', ' | ', html)
-        html = re.sub(r'</td>', ' | ', html)
-        html = re.sub(r'<tr[^>]*>', '\n', html)
-        html = re.sub(r'</tr>', '\n', html)
-        html = re.sub(r'<[^>]+>', '', html)  # Remove all other tags
-        
-        # Clean up extra whitespace
-        html = re.sub(r'\n\s*\n', '\n\n', html)
-        html = html.strip()
-        
-        return html
\ No newline at end of file
+        # partition skips the throwaway list and first-chunk copy that split(',')
+        # would make of a potentially multi-MB payload
+        _, _, payload = img_data.partition(',')  # Remove data:image/...;base64, prefix
+        img_bytes = base64.b64decode(payload)
+        img = Image.open(BytesIO(img_bytes))
+        # for JPEGs draft() downscales during the decode itself (libjpeg DCT-domain
+        # scaling), so oversized photos never materialize at full resolution;
+        # it is a no-op for PNG
+        img.draft('RGB', _MAX_IMAGE_SIZE_PX)
+        img.load()
+        # the page never needs more pixels than US Letter at 200 dpi, so shrink anything
+        # larger here (thumbnail never upscales) instead of letting matplotlib resample
+        # the full-resolution bitmap at savefig time; draft() above already got JPEGs
+        # most of the way down during the decode
+        img.thumbnail(_MAX_IMAGE_SIZE_PX, Image.BILINEAR)
+
+        # build the ndarray from a single tobytes() buffer here on the worker thread -
+        # imshow(pil_image) would go through np.asarray, whose chunked encode-and-join
+        # conversion is measurably slower on full-page images
+        if img.mode not in ('RGB', 'RGBA', 'L'):
+            img = img.convert('RGB')
+        width, height = img.size
+        channels = len(img.getbands())
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        return np.frombuffer(img.tobytes(), dtype=np.uint8).reshape(shape)
+
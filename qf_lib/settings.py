@@ -32,6 +32,17 @@ class Settings:
         if init_properties:
             self._init_settings()
 
+    @classmethod
+    def from_dict(cls, settings_dict: dict) -> "Settings":
+        """
+        Creates a Settings object directly from a dictionary of properties, without reading
+        any settings file from disk. Nested dictionaries become nested Settings objects,
+        exactly as if the dictionary had been loaded from a settings file.
+        """
+        settings = cls(None, None, init_properties=False)
+        settings._add_settings(settings, dict(settings_dict))
+        return settings
+
     def _init_settings(self):
         merged_config = self._load_config_dict()
         self._add_settings(self, merged_config)
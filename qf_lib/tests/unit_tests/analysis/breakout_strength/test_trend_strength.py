@@ -0,0 +1,130 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import unittest
+
+import numpy as np
+from pandas import date_range
+
+import qf_lib.analysis.breakout_strength.trend_strength as trend_strength_module
+from qf_lib.analysis.breakout_strength.trend_strength import down_trend_strength, trend_strength, \
+    trend_strengths_all, up_trend_strength
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.containers.dataframe.prices_dataframe import PricesDataFrame
+
+
+def _make_prices_df(nr_of_rows: int, nan_rows=(), nan_fields=None) -> PricesDataFrame:
+    rng = np.random.default_rng(nr_of_rows)
+    open_prices = 100 + rng.standard_normal(nr_of_rows)
+    close_prices = open_prices * (1 + rng.standard_normal(nr_of_rows) * 0.02)
+    high_prices = np.maximum(open_prices, close_prices) * (1 + np.abs(rng.standard_normal(nr_of_rows)) * 0.01)
+    low_prices = np.minimum(open_prices, close_prices) * (1 - np.abs(rng.standard_normal(nr_of_rows)) * 0.01)
+
+    prices_df = PricesDataFrame(data={
+        PriceField.Open: open_prices, PriceField.High: high_prices,
+        PriceField.Low: low_prices, PriceField.Close: close_prices
+    }, index=date_range('2020-01-01', periods=nr_of_rows, freq='D'))
+
+    nan_fields = nan_fields if nan_fields is not None else list(prices_df.columns)
+    for row in nan_rows:
+        for field in nan_fields:
+            prices_df.iloc[row, prices_df.columns.get_loc(field)] = np.nan
+    return prices_df
+
+
+class TestTrendStrength(unittest.TestCase):
+    """
+    The functions have a numba kernel and a NumPy fallback path selected at call time;
+    all the behavioural tests below are run against both, and an explicit parity test
+    guards against the two implementations diverging.
+    """
+
+    test_cases = None  # type: list
+
+    @classmethod
+    def setUpClass(cls):
+        cls.test_cases = [
+            _make_prices_df(30),
+            _make_prices_df(30, nan_rows=[7]),
+            _make_prices_df(30, nan_rows=[3, 15, 22]),
+            _make_prices_df(30, nan_rows=[5], nan_fields=[PriceField.High]),
+            _make_prices_df(30, nan_rows=[9], nan_fields=[PriceField.Low]),
+            _make_prices_df(30, nan_rows=[2, 11], nan_fields=[PriceField.Close]),
+            _make_prices_df(4),
+            _make_prices_df(10),
+        ]
+
+    def _results_for(self, prices_df, use_next_open_instead_of_close, use_kernels: bool):
+        original_flag = trend_strength_module.is_numba_installed
+        trend_strength_module.is_numba_installed = original_flag and use_kernels
+        try:
+            return (trend_strength(prices_df, use_next_open_instead_of_close),
+                    down_trend_strength(prices_df, use_next_open_instead_of_close),
+                    up_trend_strength(prices_df, use_next_open_instead_of_close),
+                    trend_strengths_all(prices_df, use_next_open_instead_of_close))
+        finally:
+            trend_strength_module.is_numba_installed = original_flag
+
+    def assertValuesEqual(self, first, second, msg=None):
+        """ NaN results are considered equal (both paths degenerated the same way). """
+        self.assertTrue((np.isnan(first) and np.isnan(second)) or np.isclose(first, second),
+                        msg="{} != {}{}".format(first, second, " ({})".format(msg) if msg else ""))
+
+    def test_nan_rows_do_not_poison_the_statistics(self):
+        prices_df = _make_prices_df(30, nan_rows=[7])
+        reference_df = _make_prices_df(30).drop(_make_prices_df(30).index[7])
+
+        for use_kernels in (True, False):
+            overall, down, up, _ = self._results_for(prices_df, False, use_kernels)
+            self.assertFalse(np.isnan(overall))
+            self.assertFalse(np.isnan(down))
+            self.assertFalse(np.isnan(up))
+
+            # a fully-NaN row must behave exactly as if the row was not there at all
+            expected_overall, expected_down, expected_up, _ = self._results_for(reference_df, False, use_kernels)
+            self.assertValuesEqual(overall, expected_overall)
+            self.assertValuesEqual(down, expected_down)
+            self.assertValuesEqual(up, expected_up)
+
+    def test_kernels_match_numpy_fallback(self):
+        for case_nr, prices_df in enumerate(self.test_cases):
+            for use_next_open in (False, True):
+                kernel_results = self._results_for(prices_df, use_next_open, use_kernels=True)
+                fallback_results = self._results_for(prices_df, use_next_open, use_kernels=False)
+                for kernel_value, fallback_value in zip(kernel_results[:3], fallback_results[:3]):
+                    self.assertValuesEqual(kernel_value, fallback_value, msg="case {}".format(case_nr))
+                for kernel_value, fallback_value in zip(kernel_results[3], fallback_results[3]):
+                    self.assertValuesEqual(kernel_value, fallback_value, msg="case {}".format(case_nr))
+
+    def test_trend_strengths_all_matches_separate_functions(self):
+        for prices_df in self.test_cases:
+            for use_next_open in (False, True):
+                for use_kernels in (True, False):
+                    overall, down, up, fused = self._results_for(prices_df, use_next_open, use_kernels)
+                    self.assertValuesEqual(fused[0], overall)
+                    self.assertValuesEqual(fused[1], down)
+                    self.assertValuesEqual(fused[2], up)
+
+    def test_short_frames_return_nan_for_down_and_up(self):
+        prices_df = _make_prices_df(3)
+        for use_kernels in (True, False):
+            _, down, up, fused = self._results_for(prices_df, False, use_kernels)
+            self.assertTrue(np.isnan(down))
+            self.assertTrue(np.isnan(up))
+            self.assertTrue(np.isnan(fused[1]))
+            self.assertTrue(np.isnan(fused[2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import unittest
+from unittest import TestCase, skipIf
+
+import numpy as np
+from pandas import date_range
+
+try:
+    # importing the sheet pulls in PDFExporter, which needs WeasyPrint and its native
+    # libraries - an OSError rather than an ImportError when the shared libs are missing
+    from qf_lib.analysis.breakout_strength.trend_strength_sheet import TrendStrengthSheet
+
+    is_trend_strength_sheet_importable = True
+except (ImportError, OSError):
+    is_trend_strength_sheet_importable = False
+
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.common.tickers.tickers import BloombergTicker
+from qf_lib.containers.dataframe.prices_dataframe import PricesDataFrame
+from qf_lib.documents_utils.document_exporting.document import Document
+from qf_lib.tests.unit_tests.config.test_settings import get_test_settings
+
+
+@skipIf(not is_trend_strength_sheet_importable,
+        "WeasyPrint (required to import the trend strength sheet) is not installed. Tests are being skipped.")
+class TestTrendStrengthSheet(TestCase):
+    def setUp(self):
+        nr_of_rows = 40
+        rng = np.random.default_rng(0)
+        open_prices = 100 + rng.standard_normal(nr_of_rows)
+        close_prices = open_prices * (1 + rng.standard_normal(nr_of_rows) * 0.02)
+        high_prices = np.maximum(open_prices, close_prices) * 1.01
+        low_prices = np.minimum(open_prices, close_prices) * 0.99
+
+        self.prices_df = PricesDataFrame(data={
+            PriceField.Open: open_prices, PriceField.High: high_prices,
+            PriceField.Low: low_prices, PriceField.Close: close_prices
+        }, index=date_range('2020-01-01', periods=nr_of_rows, freq='D'))
+
+        self.sheet = TrendStrengthSheet(get_test_settings(), pdf_exporter=None, price_provider=None, window_len=10)
+        self.sheet.document = Document("test")
+        self.sheet.use_next_open_instead_of_close = False
+        self.sheet.ticker_to_trend_dict = {}
+
+    def test_insert_table_with_overall_measures(self):
+        ticker = BloombergTicker("SPY US Equity")
+        self.sheet._insert_table_with_overall_measures(self.prices_df, ticker)
+
+        self.assertEqual(len(self.sheet.document.elements), 1)
+        self.assertIn(ticker, self.sheet.ticker_to_trend_dict)
+        trend_strength_1y, trend_strength_overall = self.sheet.ticker_to_trend_dict[ticker]
+        self.assertFalse(np.isnan(trend_strength_1y))
+        self.assertFalse(np.isnan(trend_strength_overall))
+
+    def test_add_up_and_down_trend_strength(self):
+        self.sheet._add_up_and_down_trend_strength(self.prices_df)
+        self.assertEqual(len(self.sheet.document.elements), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,8 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+import json
+import unittest
 from os.path import join
 
 from qf_lib.get_sources_root import get_src_root
@@ -22,3 +24,37 @@ def get_test_settings() -> Settings:
     config_dir = join(get_src_root(), 'qf_lib', 'tests', 'unit_tests', 'config')
     test_settings_path = join(config_dir, 'test_settings.json')
     return Settings(test_settings_path)
+
+
+class TestSettingsFromDict(unittest.TestCase):
+    def test_from_dict_flat(self):
+        settings = Settings.from_dict({"output_directory": "output", "company_name": "ACME"})
+        self.assertEqual(settings.output_directory, "output")
+        self.assertEqual(settings.company_name, "ACME")
+
+    def test_from_dict_nested(self):
+        settings = Settings.from_dict({
+            "output_directory": "output",
+            "smtp": {"host": "smtp.example.com", "tls": True, "auth": {"port": 587}}
+        })
+        self.assertIsInstance(settings.smtp, Settings)
+        self.assertEqual(settings.smtp.host, "smtp.example.com")
+        self.assertTrue(settings.smtp.tls)
+        self.assertEqual(settings.smtp.auth.port, 587)
+
+    def test_from_dict_matches_file_loading(self):
+        config_dir = join(get_src_root(), 'qf_lib', 'tests', 'unit_tests', 'config')
+        with open(join(config_dir, 'test_settings.json')) as file:
+            settings_dict = json.load(file)
+
+        dict_settings = Settings.from_dict(settings_dict)
+        file_settings = get_test_settings()
+
+        self.assertEqual(dict_settings.company_name, file_settings.company_name)
+        self.assertEqual(dict_settings.output_directory, file_settings.output_directory)
+        self.assertEqual(dict_settings.bloomberg.port, file_settings.bloomberg.port)
+        self.assertEqual(dict_settings.smtp.tls, file_settings.smtp.tls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import base64
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from unittest import TestCase, skipIf
+
+from PIL import Image
+
+from qf_lib.documents_utils.document_exporting.document import Document
+from qf_lib.documents_utils.document_exporting.simple_pdf_exporter import SimplePDFExporter, is_pymupdf_installed
+from qf_lib.starting_dir import get_starting_dir_abs_path, set_starting_dir_abs_path
+from qf_lib.tests.unit_tests.config.test_settings import get_test_settings
+
+if is_pymupdf_installed:
+    import fitz
+
+
+class _HtmlElement:
+    """ Minimal document element returning fixed HTML. """
+
+    def __init__(self, html: str):
+        self._html = html
+
+    def generate_html(self, document=None) -> str:
+        return self._html
+
+
+def _png_data_uri() -> str:
+    image = Image.new('RGB', (60, 40), color=(200, 10, 10))
+    buffer = BytesIO()
+    image.save(buffer, format='PNG')
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+class TestSimplePDFExporter(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            get_starting_dir_abs_path()
+        except KeyError:
+            set_starting_dir_abs_path(tempfile.mkdtemp())
+
+        # long lines (like flattened table rows) and enough of them to span several pages
+        long_row = " | ".join("cell{}value".format(i) for i in range(40))
+        cls.html = "<h1>Title</h1>" + "".join("<p>{}</p>".format(long_row) for _ in range(60)) \
+                   + '<img src="{}">'.format(_png_data_uri())
+        cls.settings = get_test_settings()
+
+    def _make_document(self) -> Document:
+        document = Document("report.html")
+        document.add_element(_HtmlElement(self.html))
+        return document
+
+    @skipIf(not is_pymupdf_installed, "PyMuPDF is not installed. Tests are being skipped.")
+    def test_generate_with_pymupdf_backend(self):
+        exporter = SimplePDFExporter(self.settings)
+        output_filename = exporter.generate([self._make_document()], "", "report.html")
+
+        self.assertTrue(os.path.exists(output_filename))
+        with fitz.open(output_filename) as pdf_document:
+            text_pages = [pdf_document[i].get_text() for i in range(pdf_document.page_count)
+                          if not pdf_document[i].get_images()]
+            image_pages = [i for i in range(pdf_document.page_count) if pdf_document[i].get_images()]
+
+            self.assertGreater(len(text_pages), 1)
+            self.assertEqual(len(image_pages), 1)
+            # no silently blank text pages, and no content dropped
+            for page_text in text_pages:
+                self.assertGreater(len(page_text.strip()), 0)
+            all_text = "".join(text_pages).replace('\n', ' ')
+            self.assertEqual(all_text.count("cell39value"), 60)
+
+    def test_generate_with_matplotlib_backend(self):
+        exporter = SimplePDFExporter(self.settings, use_pymupdf=False)
+        output_filename = exporter.generate([self._make_document()], "", "report_mpl.html")
+
+        self.assertTrue(os.path.exists(output_filename))
+        self.assertGreater(os.path.getsize(output_filename), 1000)
+        if is_pymupdf_installed:
+            with fitz.open(output_filename) as pdf_document:
+                all_text = "".join(pdf_document[i].get_text()
+                                   for i in range(pdf_document.page_count)).replace('\n', ' ')
+                self.assertEqual(all_text.count("cell39value"), 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
